@@ -3,16 +3,29 @@ Production-ready Flask backend for Internship Email Automation
 Designed for deployment on Render, Railway, Vercel, or similar platforms
 """
 
+import base64
+import copy
+import io
+import logging
+import logging.handlers
+import mimetypes
+import mmap
 import os
+import queue
+import random
 import re
 import smtplib
+import string
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from email import policy
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
 from werkzeug.utils import secure_filename
-import csv
+import pandas as pd
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
@@ -35,61 +48,289 @@ MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
-def clean_text(text):
-    """Clean and normalize text data"""
-    if not text:
-        return ''
-    return text.replace('\xa0', ' ').replace('\u00a0', ' ').replace(r'[^\x20-\x7E]', ' ').strip()
+# Load the mime-type database at import so the first campaign doesn't
+# pay for the lazy initialization inside guess_type
+mimetypes.init()
+
+# Campaign progress logging: records pass through a queue drained by one
+# background thread, so sender threads never block on stderr I/O and
+# records below the active level are never formatted at all
+log = logging.getLogger('coldmailbot')
+if not log.handlers:
+    _log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(
+        _log_queue, logging.StreamHandler()
+    )
+    _log_listener.start()
+    log.addHandler(logging.handlers.QueueHandler(_log_queue))
+    log.setLevel(logging.INFO)
+
+class Contact(NamedTuple):
+    """One validated contact row from the uploaded CSV"""
+    name: str
+    email: str
+    company: str
+
+# Compiled once; shared by validate_email and the vectorized CSV mask
+EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+
+_FORMATTER = string.Formatter()
+
+def compile_template(template):
+    """Pre-split a format template so each render is a single str.join
+
+    The literal runs between placeholders are parsed out once and reused
+    verbatim on every render; only the variable fields allocate new
+    strings per recipient. Returns a callable taking a dict of field
+    values; unknown fields raise KeyError just like str.format did.
+    """
+    segments = []
+    for literal, field, spec, conversion in _FORMATTER.parse(template):
+        if literal:
+            segments.append(literal)
+        if field is not None:
+            segments.append((field, spec, conversion))
+
+    def render(values):
+        parts = []
+        for segment in segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            else:
+                field, spec, conversion = segment
+                value = values[field]
+                if conversion:
+                    value = _FORMATTER.convert_field(value, conversion)
+                if spec:
+                    value = format(value, spec)
+                parts.append(value)
+        return ''.join(parts)
+
+    return render
 
 def validate_email(email):
     """Validate email format"""
-    pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-    return re.match(pattern, email) is not None
+    return EMAIL_RE.match(email) is not None
+
+def _map_csv_columns(headers):
+    """Map CSV column names flexibly onto name/email/company"""
+    column_mapping = {}
+    for col in headers:
+        col_lower = str(col).lower().strip()
+        if 'name' in col_lower or 'hr' in col_lower or 'contact' in col_lower:
+            column_mapping['name'] = col
+        elif 'email' in col_lower or 'mail' in col_lower:
+            column_mapping['email'] = col
+        elif 'company' in col_lower or 'organization' in col_lower or 'firm' in col_lower:
+            column_mapping['company'] = col
+
+    required_fields = ['name', 'email', 'company']
+    missing_fields = [field for field in required_fields if field not in column_mapping]
+
+    if missing_fields:
+        raise ValueError(
+            f'Missing required columns: {missing_fields}. Found: {list(headers)}'
+        )
+    return column_mapping
+
+def _clean_contacts_chunk(df, column_mapping):
+    """Clean and validate one parsed CSV chunk in vectorized passes"""
+    required_fields = ['name', 'email', 'company']
+    df = df[[column_mapping[field] for field in required_fields]].copy()
+    df.columns = required_fields
+
+    # Clean and normalize in vectorized passes instead of per-cell Python
+    for field in required_fields:
+        df[field] = df[field].str.replace('\xa0', ' ', regex=False).str.strip()
+
+    # Keep rows where all fields are present and the email looks valid;
+    # one boolean pass per column instead of per-row Python branching
+    mask = (
+        df['name'].str.len().gt(0)
+        & df['company'].str.len().gt(0)
+        & df['email'].str.match(EMAIL_RE)
+    )
+    return df[mask], int((~mask).sum())
+
+def iter_contacts_csv(contacts_path):
+    """Yield validated contacts chunk-by-chunk as the CSV is parsed"""
+    with open(contacts_path, 'r', encoding='utf-8', buffering=FILE_READ_BUFFER_SIZE) as csvfile:
+        try:
+            # sep=None lets pandas sniff the delimiter, as csv.Sniffer did
+            reader = pd.read_csv(
+                csvfile,
+                sep=None,
+                engine='python',
+                dtype=str,
+                keep_default_na=False,
+                chunksize=CSV_CHUNK_ROWS
+            )
+        except pd.errors.EmptyDataError:
+            raise ValueError('CSV file appears to be empty or invalid')
+
+        column_mapping = None
+        skipped = 0
+        with reader:
+            for chunk in reader:
+                if column_mapping is None:
+                    column_mapping = _map_csv_columns(chunk.columns)
+                valid, chunk_skipped = _clean_contacts_chunk(chunk, column_mapping)
+                skipped += chunk_skipped
+                for row in valid.itertuples(index=False):
+                    yield Contact(*row)
+
+        if skipped:
+            log.info('Skipped %d invalid contact row(s) in %s',
+                     skipped, os.path.basename(contacts_path))
+
+# Recycle the SMTP connection after this many messages to stay under
+# provider limits on messages-per-connection
+MAX_MESSAGES_PER_CONNECTION = 100
+
+# Default minimum spacing between sends across all workers, to avoid rate
+# limiting; overridable per request via the minInterval form field
+SEND_INTERVAL_SECONDS = 1.0
+
+# Socket timeout for SMTP operations so a stuck recipient can't hang a worker
+SMTP_TIMEOUT_SECONDS = 30
+
+# SMTP reply codes worth retrying: temporary provider pushback rather
+# than a permanent rejection of the message or recipient
+TRANSIENT_SMTP_CODES = {421, 450, 451, 452, 454}
+
+# Ceiling on the exponential retry backoff
+MAX_RETRY_BACKOFF_SECONDS = 30
+
+# Rows per parsed CSV chunk and capacity of the contact queue feeding the
+# senders; memory stays bounded no matter how large the contact list is
+CSV_CHUNK_ROWS = 500
+CONTACT_QUEUE_SIZE = 256
+
+# 64 KiB read buffer for uploaded files (fewer read() syscalls than the
+# 8 KiB default), and the block size fed to the base64 encoder — a multiple
+# of 57 so each block encodes to whole 76-character lines that concatenate
+FILE_READ_BUFFER_SIZE = 64 * 1024
+BASE64_CHUNK_BYTES = 57 * 1024
+
+class SendRateLimiter:
+    """Deadline-based limiter that spaces sends across all worker threads"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_allowed = time.monotonic()
+
+    def wait(self):
+        """Block until the next send slot opens, then claim it"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+def open_gmail_session(sender_email, app_password):
+    """Open and authenticate a reusable Gmail SMTP session"""
+    server = smtplib.SMTP('smtp.gmail.com', 587, timeout=SMTP_TIMEOUT_SECONDS)
+    server.ehlo()
+    server.starttls()
+    server.ehlo()
+    server.login(sender_email, app_password)
+    return server
+
+def build_attachment_part(resume_path):
+    """Read and base64-encode the resume once, returning a reusable MIME part
+
+    The returned part acts as a template: each outgoing message attaches a
+    shallow copy, so per-message headers stay independent while every copy
+    shares the same immutable pre-encoded payload string — the base64 pass
+    runs once per campaign, not once per recipient.
+    """
+    if not resume_path or not os.path.exists(resume_path):
+        return None
+
+    # Map the file read-only and encode block-by-block straight from the
+    # mapping: the raw bytes live only in the shared page cache (never
+    # copied into the heap) and peak memory is roughly the encoded size,
+    # however many workers later send copies of the part
+    encoded = io.BytesIO()
+    with open(resume_path, "rb") as attachment:
+        size = os.fstat(attachment.fileno()).st_size
+        if size:
+            with mmap.mmap(attachment.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    for offset in range(0, size, BASE64_CHUNK_BYTES):
+                        # Release each block so no buffer export outlives
+                        # the mapping
+                        with view[offset:offset + BASE64_CHUNK_BYTES] as block:
+                            encoded.write(base64.encodebytes(block))
+
+    # Guessed once per campaign since the attachment never changes
+    content_type, _ = mimetypes.guess_type(resume_path)
+    main_type, sub_type = (content_type or 'application/octet-stream').split('/', 1)
 
-def send_email_via_gmail(sender_email, app_password, recipient_email, subject, body, resume_path=None):
-    """Send email via Gmail SMTP"""
+    part = MIMEBase(main_type, sub_type)
+    part.set_payload(encoded.getvalue().decode('ascii'))
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header(
+        'Content-Disposition',
+        f'attachment; filename= {os.path.basename(resume_path)}'
+    )
+    return part
+
+def send_email_via_gmail(server, sender_email, recipient_emails, subject, body, attachment_part=None):
+    """Send one message to one or more recipients over an authenticated session
+
+    Returns (success, message, refused) where refused maps any recipient
+    the server rejected to its (code, response). smtplib only raises when
+    every recipient is refused; a partial refusal in a multi-RCPT
+    transaction is reported through this dict instead.
+    """
     try:
-        msg = MIMEMultipart()
+        # policy.SMTP gives the modern header-folding and CRLF serialization
+        # path when send_message flattens through its BytesGenerator
+        msg = MIMEMultipart(policy=policy.SMTP)
         msg['From'] = sender_email
-        msg['To'] = recipient_email
+        # A single recipient is addressed directly; a batch goes out
+        # BCC-style, with the recipients carried only in the SMTP envelope
+        # so addresses are not disclosed to each other
+        msg['To'] = recipient_emails[0] if len(recipient_emails) == 1 else sender_email
         msg['Subject'] = subject
-        
+
+        attach = msg.attach
+
         # Add body
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Add resume attachment if provided
-        if resume_path and os.path.exists(resume_path):
-            with open(resume_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-                
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename= {os.path.basename(resume_path)}'
-            )
-            msg.attach(part)
-        
-        # Connect to Gmail SMTP server
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, app_password)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(sender_email, recipient_email, text)
-        server.quit()
-        
-        return True, "Email sent successfully"
-        
+        attach(MIMEText(body, 'plain'))
+
+        # Attach the pre-built resume part; a shallow copy keeps per-message
+        # headers independent while sharing the encoded payload string
+        if attachment_part is not None:
+            attach(copy.copy(attachment_part))
+
+        # Stream the message to the socket in chunks (send_message uses a
+        # BytesGenerator) instead of materializing the whole MIME string,
+        # then reset transaction state so the session is ready for the next
+        refused = server.send_message(msg, from_addr=sender_email, to_addrs=recipient_emails)
+        server.rset()
+
+        return True, "Email sent successfully", refused
+
+    except smtplib.SMTPServerDisconnected:
+        # Let the caller reconnect and retry on a fresh session
+        raise
     except Exception as e:
+        if (isinstance(e, smtplib.SMTPResponseException)
+                and e.smtp_code in TRANSIENT_SMTP_CODES):
+            # Temporary provider pushback (421/450/...); let the caller
+            # back off and retry instead of recording a final failure
+            raise
         error_msg = str(e)
         if "Invalid login" in error_msg:
-            return False, "Invalid Gmail credentials. Please check your email and app password."
+            return False, "Invalid Gmail credentials. Please check your email and app password.", {}
         elif "Authentication failed" in error_msg:
-            return False, "Gmail authentication failed. Make sure you're using an App Password, not your regular password."
+            return False, "Gmail authentication failed. Make sure you're using an App Password, not your regular password.", {}
         else:
-            return False, f"Failed to send email: {error_msg}"
+            return False, f"Failed to send email: {error_msg}", {}
 
 @app.route('/', methods=['GET'])
 def root():
@@ -158,9 +399,7 @@ def test_connection():
         
         # Test connection
         try:
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(email, app_password)
+            server = open_gmail_session(email, app_password)
             server.quit()
             
             return jsonify({
@@ -224,124 +463,315 @@ def send_emails():
         contacts_file.save(contacts_path)
         resume_file.save(resume_path)
         
-        # Parse CSV contacts
+        # Start parsing the CSV lazily; pull the first contact now so header
+        # and format problems still fail the request before anything is sent
+        contacts_iter = iter_contacts_csv(contacts_path)
         try:
-            contacts = []
-            with open(contacts_path, 'r', encoding='utf-8') as csvfile:
-                # Try to detect delimiter
-                sample = csvfile.read(1024)
-                csvfile.seek(0)
-                sniffer = csv.Sniffer()
-                delimiter = sniffer.sniff(sample).delimiter
-                
-                reader = csv.DictReader(csvfile, delimiter=delimiter)
-                headers = reader.fieldnames
-                
-                if not headers:
-                    return jsonify({
-                        'success': False,
-                        'message': 'CSV file appears to be empty or invalid'
-                    }), 400
-                
-                # Map column names flexibly
-                column_mapping = {}
-                for col in headers:
-                    col_lower = col.lower().strip()
-                    if 'name' in col_lower or 'hr' in col_lower or 'contact' in col_lower:
-                        column_mapping['name'] = col
-                    elif 'email' in col_lower or 'mail' in col_lower:
-                        column_mapping['email'] = col
-                    elif 'company' in col_lower or 'organization' in col_lower or 'firm' in col_lower:
-                        column_mapping['company'] = col
-                
-                required_fields = ['name', 'email', 'company']
-                missing_fields = [field for field in required_fields if field not in column_mapping]
-                
-                if missing_fields:
-                    return jsonify({
-                        'success': False,
-                        'message': f'Missing required columns: {missing_fields}. Found: {list(headers)}'
-                    }), 400
-                
-                # Extract contacts
-                for row in reader:
-                    if row:  # Skip empty rows
-                        contact = {
-                            'name': clean_text(str(row.get(column_mapping['name'], ''))),
-                            'email': clean_text(str(row.get(column_mapping['email'], ''))),
-                            'company': clean_text(str(row.get(column_mapping['company'], '')))
-                        }
-                        
-                        # Validate contact data
-                        if contact['name'] and contact['email'] and contact['company']:
-                            if validate_email(contact['email']):
-                                contacts.append(contact)
-            
-            if not contacts:
-                return jsonify({
-                    'success': False,
-                    'message': 'No valid contacts found in CSV file'
-                }), 400
-                
+            first_contact = next(contacts_iter)
+        except StopIteration:
+            return jsonify({
+                'success': False,
+                'message': 'No valid contacts found in CSV file'
+            }), 400
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Error parsing CSV: {str(e)}'
             }), 400
         
-        # Send emails
-        results = []
-        successful = 0
-        
-        for contact in contacts:
+        # Number of parallel SMTP sessions (Gmail tolerates ~15 concurrent)
+        try:
+            concurrency = int(request.form.get('concurrency', 5))
+        except (TypeError, ValueError):
+            concurrency = 5
+        concurrency = max(1, min(concurrency, 10))
+
+        # Minimum spacing between sends, shared by all workers
+        try:
+            min_interval = float(request.form.get('minInterval', SEND_INTERVAL_SECONDS))
+        except (TypeError, ValueError):
+            min_interval = SEND_INTERVAL_SECONDS
+        min_interval = max(0.0, min(min_interval, 60.0))
+        rate_limiter = SendRateLimiter(min_interval)
+
+        # Recipients per SMTP transaction. Values above 1 only take effect
+        # when contiguous contacts render byte-identical messages (e.g. a
+        # template without {hr_name}); personalized messages still go out
+        # one transaction each
+        try:
+            batch_size = int(request.form.get('batchSize', 1))
+        except (TypeError, ValueError):
+            batch_size = 1
+        batch_size = max(1, min(batch_size, 50))
+
+        # Retry budget per transaction for transient SMTP errors
+        try:
+            max_retries = int(request.form.get('maxRetries', 2))
+        except (TypeError, ValueError):
+            max_retries = 2
+        max_retries = max(0, min(max_retries, 5))
+
+        # Verify credentials once up front so auth failures fail fast
+        # instead of surfacing per contact inside the worker pool
+        try:
+            probe = open_gmail_session(gmail_email, gmail_password)
+            probe.quit()
+        except Exception as e:
+            error_msg = str(e)
+            if "Invalid login" in error_msg or "Authentication failed" in error_msg:
+                return jsonify({
+                    'success': False,
+                    'message': 'Gmail authentication failed. Please check your App Password.'
+                }), 401
+            return jsonify({
+                'success': False,
+                'message': f'Could not connect to Gmail: {error_msg}'
+            }), 500
+
+        # Build the campaign-invariant pieces once: the encoded resume part
+        # and the sender's display name are identical for every contact
+        attachment_part = build_attachment_part(resume_path)
+        sender_name = gmail_email.split('@')[0].replace('.', ' ').title()
+
+        # Pre-substitute the campaign-constant sender name into the
+        # templates once, then compile both into segment lists so each
+        # per-contact render is a single join over mostly-shared strings
+        email_subject = email_subject.replace('{sender_name}', sender_name)
+        email_body = email_body.replace('{sender_name}', sender_name)
+
+        try:
+            render_subject = compile_template(email_subject)
+            render_body = compile_template(email_body)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid template: {str(e)}'
+            }), 400
+
+        # Each worker thread holds one persistent SMTP session; a shared
+        # limiter spaces sends so the global rate stays at the old pace
+        # regardless of how many sessions are in flight
+        local = threading.local()
+        sessions = []
+        sessions_lock = threading.Lock()
+
+        def get_session(fresh=False):
+            """Return this thread's SMTP session, opening or recycling as needed"""
+            server = getattr(local, 'server', None)
+            recycle = fresh or (
+                server is not None
+                and local.sent_on_connection >= MAX_MESSAGES_PER_CONNECTION
+            )
+            if server is not None and recycle:
+                try:
+                    server.quit()
+                except smtplib.SMTPException:
+                    pass
+                with sessions_lock:
+                    if server in sessions:
+                        sessions.remove(server)
+                server = None
+            if server is None:
+                server = open_gmail_session(gmail_email, gmail_password)
+                local.server = server
+                local.sent_on_connection = 0
+                with sessions_lock:
+                    sessions.append(server)
+            return server
+
+        def render_contact(contact):
+            """Render the personalized subject and body for one contact"""
+            values = {
+                'hr_name': contact.name,
+                'company': contact.company
+            }
+            return render_subject(values), render_body(values)
+
+        def send_batch(batch, subject, body):
+            """Send one SMTP transaction covering every contact in the batch"""
+            recipient_emails = [contact.email for contact in batch]
             try:
-                # Generate personalized email content
-                sender_name = gmail_email.split('@')[0].replace('.', ' ').title()
-                
-                subject = email_subject.format(
-                    hr_name=contact['name'],
-                    company=contact['company'],
-                    sender_name=sender_name
-                )
-                
-                body = email_body.format(
-                    hr_name=contact['name'],
-                    company=contact['company'],
-                    sender_name=sender_name
-                )
-                
-                # Send email
-                success, message = send_email_via_gmail(
-                    gmail_email,
-                    gmail_password,
-                    contact['email'],
-                    subject,
-                    body,
-                    resume_path
-                )
-                
-                results.append({
-                    'contact': contact['name'],
-                    'email': contact['email'],
-                    'company': contact['company'],
-                    'success': success,
-                    'message': message
-                })
-                
-                if success:
-                    successful += 1
-                    # Add delay between emails to avoid rate limiting
-                    time.sleep(2)
-                
+                reconnect = False
+                for attempt in range(max_retries + 1):
+                    rate_limiter.wait()
+
+                    try:
+                        # Send email, reconnecting once if the session dropped
+                        server = get_session(fresh=reconnect)
+                        try:
+                            success, message, refused = send_email_via_gmail(
+                                server,
+                                gmail_email,
+                                recipient_emails,
+                                subject,
+                                body,
+                                attachment_part
+                            )
+                        except smtplib.SMTPServerDisconnected:
+                            server = get_session(fresh=True)
+                            success, message, refused = send_email_via_gmail(
+                                server,
+                                gmail_email,
+                                recipient_emails,
+                                subject,
+                                body,
+                                attachment_part
+                            )
+
+                        local.sent_on_connection += 1
+                        break
+
+                    except smtplib.SMTPResponseException as e:
+                        # get_session() can raise here too (e.g. a 535 on
+                        # reconnect), bypassing send_email_via_gmail's
+                        # transient filter — only genuine transient codes
+                        # may consume the retry budget
+                        if e.smtp_code not in TRANSIENT_SMTP_CODES:
+                            raise
+                        # Back off with jitter and retry on a fresh session
+                        if attempt == max_retries:
+                            raise
+                        with results_lock:
+                            retry_count[0] += 1
+                        delay = min(2 ** attempt + random.random(),
+                                    MAX_RETRY_BACKOFF_SECONDS)
+                        log.info('Transient SMTP %d for %d recipient(s), '
+                                 'retry %d/%d in %.1fs',
+                                 e.smtp_code, len(recipient_emails),
+                                 attempt + 1, max_retries, delay)
+                        time.sleep(delay)
+                        reconnect = True
+
             except Exception as e:
-                results.append({
-                    'contact': contact['name'],
-                    'email': contact['email'],
-                    'company': contact['company'],
-                    'success': False,
-                    'message': f'Error: {str(e)}'
+                success, message, refused = False, f'Error: {str(e)}', {}
+
+            # smtplib only raises when every recipient is refused; a partial
+            # refusal comes back as a dict, so flag those contacts
+            # individually instead of blanketing the batch with one outcome
+            batch_results = []
+            for contact in batch:
+                contact_success, contact_message = success, message
+                if success and contact.email in refused:
+                    code, resp = refused[contact.email]
+                    if isinstance(resp, bytes):
+                        resp = resp.decode('utf-8', errors='replace')
+                    contact_success = False
+                    contact_message = f'Recipient refused: {code} {resp}'
+
+                # Lazy %s formatting: no string work unless the record is emitted
+                if contact_success:
+                    log.info('%s <%s> @ %s: %s',
+                             contact.name, contact.email, contact.company,
+                             contact_message)
+                else:
+                    log.warning('%s <%s> @ %s failed: %s',
+                                contact.name, contact.email, contact.company,
+                                contact_message)
+
+                batch_results.append({
+                    'contact': contact.name,
+                    'email': contact.email,
+                    'company': contact.company,
+                    'success': contact_success,
+                    'message': contact_message
                 })
-        
+
+            return batch_results
+
+        # Pipeline: a producer thread streams contacts from the CSV into a
+        # bounded queue while the worker pool drains it, so the first email
+        # goes out as soon as the first chunk is parsed
+        contact_queue = queue.Queue(maxsize=CONTACT_QUEUE_SIZE)
+        results = []
+        results_lock = threading.Lock()
+        parse_errors = []
+        retry_count = [0]
+
+        def produce_contacts():
+            """Feed parsed contacts to the workers, then signal completion"""
+            put_contact = contact_queue.put
+            try:
+                put_contact(first_contact)
+                for contact in contacts_iter:
+                    put_contact(contact)
+            except Exception as e:
+                parse_errors.append(str(e))
+            finally:
+                # One sentinel per worker unblocks the whole pool
+                for _ in range(concurrency):
+                    put_contact(None)
+
+        def drain_contacts():
+            """Send queued contacts until the producer's sentinel arrives"""
+            # Bind hot lookups once per worker so the per-contact loop runs
+            # on LOAD_FAST instead of repeated attribute resolution
+            get_contact = contact_queue.get
+            record = results.extend
+
+            # Contiguous contacts whose rendered message is identical are
+            # grouped into one multi-RCPT transaction, up to batch_size
+            batch = []
+            batch_key = None
+
+            def flush_batch():
+                nonlocal batch
+                if batch:
+                    batch_results = send_batch(batch, *batch_key)
+                    with results_lock:
+                        record(batch_results)
+                    batch = []
+
+            while True:
+                contact = get_contact()
+                if contact is None:
+                    break
+
+                try:
+                    key = render_contact(contact)
+                except Exception as e:
+                    log.warning('%s <%s> @ %s failed: %s',
+                                contact.name, contact.email, contact.company, e)
+                    with results_lock:
+                        record([{
+                            'contact': contact.name,
+                            'email': contact.email,
+                            'company': contact.company,
+                            'success': False,
+                            'message': f'Error: {str(e)}'
+                        }])
+                    continue
+
+                if batch and (key != batch_key or len(batch) >= batch_size):
+                    flush_batch()
+
+                batch_key = key
+                batch.append(contact)
+
+            flush_batch()
+
+        producer = threading.Thread(target=produce_contacts, daemon=True)
+        producer.start()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(drain_contacts)
+
+        producer.join()
+
+        successful = sum(1 for result in results if result['success'])
+
+        # Close all worker SMTP sessions
+        for session in sessions:
+            try:
+                session.quit()
+            except smtplib.SMTPException:
+                pass
+
         # Cleanup temporary files
         try:
             os.remove(contacts_path)
@@ -349,14 +779,22 @@ def send_emails():
         except:
             pass
         
+        log.info('Campaign finished: %d/%d sent', successful, len(results))
+
+        message = f'Email campaign completed. {successful}/{len(results)} emails sent successfully.'
+        if parse_errors:
+            log.warning('CSV parsing stopped early: %s', parse_errors[0])
+            message += f' CSV parsing stopped early: {parse_errors[0]}'
+
         return jsonify({
             'success': True,
-            'message': f'Email campaign completed. {successful}/{len(contacts)} emails sent successfully.',
+            'message': message,
             'results': results,
             'summary': {
-                'total': len(contacts),
+                'total': len(results),
                 'successful': successful,
-                'failed': len(contacts) - successful
+                'failed': len(results) - successful,
+                'retries': retry_count[0]
             }
         })
         